@@ -1,3 +1,4 @@
+import importlib.util
 import subprocess
 import sys
 
@@ -5,151 +6,266 @@ import sys
 def install_package(package):
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
-# List of required dependencies
-required_packages = [
-    "os", "subprocess", "re", "json", "collections", "dash", "plotly", "pandas", "kaleido"
+# List of required third-party dependencies (the standard library is always present).
+# The interactive dashboard (--interactive) needs the Dash stack; the default
+# batch mode only needs matplotlib to write the PNG
+if "--interactive" in sys.argv:
+    required_packages = ["dash", "plotly", "pandas", "numpy", "kaleido"]
+else:
+    required_packages = ["matplotlib"]
+
+# Packages the tool can run without (a slower fallback is used instead)
+optional_packages = [
+    "orjson"
 ]
 
-# Check and install missing packages
-for package in required_packages:
-    try:
-        __import__(package)
-    except ImportError:
+# Check for missing packages without importing them; pip is only run on request
+missing_packages = [package for package in required_packages
+                    if importlib.util.find_spec(package) is None]
+missing_optional = [package for package in optional_packages
+                    if importlib.util.find_spec(package) is None]
+if "--install-deps" in sys.argv:
+    for package in missing_packages:
         print(f"Package {package} not found. Installing...")
         install_package(package)
+    for package in missing_optional:
+        print(f"Optional package {package} not found. Installing...")
+        try:
+            install_package(package)
+        except subprocess.CalledProcessError as e:
+            print(f"Could not install {package} ({e}); continuing without it.")
+elif missing_packages:
+    print(f"Missing packages: {', '.join(missing_packages)}. "
+          "Install them or re-run with --install-deps.")
+    sys.exit(1)
 
 import os
 import subprocess
-import re
 import json
+import mmap
 from collections import Counter
-import dash
-from dash import dcc, html, Input, Output
-import plotly.express as px
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from threading import Timer
 import webbrowser
 
+# Optional faster JSON serializer; export falls back to the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configurable paths and settings
 HISTORY_FILES = [os.path.expanduser("~/.bash_history"), os.path.expanduser("~/.zsh_history")]
 LOG_FILES = ["/var/log/syslog", "/var/log/auth.log"]
+PIPE_BUFFER_SIZE = 1 << 20  # Read buffer for streamed ausearch output
+CHART_TOP_K = 50  # Most frequent commands drawn in the chart
+
+# Literal keys located in log lines
+_COMMAND_KEY = b'COMMAND='
+_A0_KEY = b'a0="'
+_ARGC_KEY = b'argc='
+
+# ASCII-only lowercase table, applied to raw command bytes
+_LOWERCASE = bytes.maketrans(bytes(range(0x41, 0x5B)), bytes(range(0x61, 0x7B)))
+
+# Kernel thread bit in the flags field of /proc/<pid>/stat
+_PF_KTHREAD = 0x00200000
 
 
 #---------------------------- read_shell_history ----------------------------
 #  Function read_shell_history
 #
 #  Purpose:  Reads shell history files (.bash_history, .zsh_history) to extract
-#      commands used by the user. It parses each line and extracts the
-#      first word (assumed to be the command).
+#      commands used by the user. Each file is read in one go and split into
+#      lines, and the first word of each (assumed to be the command) is kept.
+#      Comment and bash timestamp lines ('#...') are skipped, as is the
+#      timestamp prefix of zsh extended-history lines.
 #
 #  Parameters:
 #      None
 #
-#  Returns:  A list of command strings (OUT) -- the commands extracted from the 
-#      user's shell history.
+#  Returns:  A generator of raw command bytes (OUT) -- the commands extracted
+#      from the user's shell history.
 #----------------------------------------------------------------------------
 def read_shell_history():
-    commands = []
     for file_path in HISTORY_FILES:
         if os.path.exists(file_path):
-            with open(file_path, 'r', errors='ignore') as f:
-                for line in f:
-                    command = line.strip().split(' ')[0]
-                    if command:
-                        commands.append(command)
-    return commands
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            for line in data.splitlines():
+                if line[:1] == b'#':
+                    continue  # Comment or bash HISTTIMEFORMAT timestamp line
+                if line.startswith(b': ') and b';' in line[:64]:
+                    # zsh extended history: ": <start>:<elapsed>;<command>"
+                    line = line.split(b';', 1)[1]
+                command = line.split(None, 1)
+                if command:
+                    yield command[0]
 
 #---------------------------- read_process_logs -----------------------------
 #  Function read_process_logs
 #
-#  Purpose:  Uses `ps aux` to get currently running processes and extracts the
-#      command portion of each. This captures active commands at runtime.
+#  Purpose:  Reads /proc/<pid>/stat for every running process and extracts the
+#      executable name (comm). This captures active commands at runtime
+#      without spawning `ps`. Kernel threads are skipped, as `ps aux` only
+#      shows them as bracketed names.
 #
 #  Parameters:
 #      None
 #
-#  Returns:  A list of command names (OUT) -- names of running processes.
+#  Returns:  A generator of raw command bytes (OUT) -- names of running
+#      processes.
 #----------------------------------------------------------------------------
 def read_process_logs():
-    commands = []
     try:
-        output = subprocess.check_output(['ps', 'aux'], text=True)
-        for line in output.strip().split('\n')[1:]:
-            parts = line.split()
-            if len(parts) > 10:
-                command = parts[10].split("/")[-1]
-                commands.append(command)
+        for pid in os.listdir('/proc'):
+            if not pid.isdigit():
+                continue
+            try:
+                # Tiny single read; unbuffered skips allocating a read buffer per process
+                with open(f'/proc/{pid}/stat', 'rb', buffering=0) as f:
+                    stat = f.read()
+            except (FileNotFoundError, ProcessLookupError):
+                continue  # Process exited while we were scanning
+            # Format: pid (comm) state ppid ... flags ...; comm may contain ')'
+            head, _, fields = stat.rpartition(b')')
+            fields = fields.split()
+            if len(fields) > 6 and int(fields[6]) & _PF_KTHREAD:
+                continue
+            command = head.partition(b'(')[2]
+            if command:
+                yield command
     except Exception as e:
         print(f"Failed to read process logs: {e}")
-    return commands
+
+#------------------------------ prefetch_files ------------------------------
+#  Function prefetch_files
+#
+#  Purpose:  Asks the kernel to start reading every given file into the page
+#      cache at once (POSIX_FADV_WILLNEED), so the reads of several large
+#      logs are in flight together instead of one after another. Missing
+#      files and platforms without posix_fadvise are silently skipped.
+#
+#  Parameters:
+#      paths (IN) -- An iterable of file paths to prefetch.
+#
+#  Returns:  None
+#----------------------------------------------------------------------------
+def prefetch_files(paths):
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
 
 #----------------------------- parse_system_logs ----------------------------
 #  Function parse_system_logs
 #
 #  Purpose:  Parses system log files (e.g., syslog, auth.log) to extract command
-#      usage. Looks for the pattern 'COMMAND=' and captures the value.
+#      usage. Looks for the literal 'COMMAND=' and captures the value up to
+#      the next whitespace. All log files are prefetched together first, then
+#      each is memory-mapped and searched for 'COMMAND=' directly, so lines
+#      without it are never copied out of the page cache.
 #
 #  Parameters:
 #      None
 #
-#  Returns:  A list of command names (OUT) -- commands found in the system logs.
+#  Returns:  A generator of raw command bytes (OUT) -- commands found in the
+#      system logs.
 #----------------------------------------------------------------------------
 def parse_system_logs():
-    commands = []
+    prefetch_files(LOG_FILES)
     for log_file in LOG_FILES:
         if os.path.exists(log_file):
-            with open(log_file, 'r', errors='ignore') as f:
-                for line in f:
-                    match = re.search(r'COMMAND=([^\s]+)', line)
-                    if match:
-                        command = match.group(1).split("/")[-1]
-                        commands.append(command)
-    return commands
+            with open(log_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue  # Empty files cannot be mapped
+                with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)  # Scanned once, front to back
+                    pos = 0
+                    while (i := mm.find(_COMMAND_KEY, pos)) != -1:
+                        start = i + len(_COMMAND_KEY)
+                        eol = mm.find(b'\n', start)
+                        if eol == -1:
+                            eol = len(mm)
+                        value = mm[start:eol]
+                        if value[:1].strip():
+                            yield value.split(None, 1)[0].rsplit(b"/", 1)[-1]
+                            pos = eol + 1
+                        else:
+                            # Empty COMMAND= value; keep looking further along the line
+                            pos = start
 
 #----------------------------- parse_audit_logs -----------------------------
 #  Function parse_audit_logs
 #
 #  Purpose:  Uses `ausearch` to extract EXECVE audit events and identifies the 
 #      command used. Useful on systems with auditd enabled for detailed tracking.
+#      Records are requested unformatted (--raw) and parsed as they stream from
+#      ausearch rather than buffered in full.
 #
 #  Parameters:
 #      None
 #
-#  Returns:  A list of command names (OUT) -- commands logged by audit framework.
+#  Returns:  A generator of raw command bytes (OUT) -- commands logged by
+#      the audit framework.
 #----------------------------------------------------------------------------
 def parse_audit_logs():
-    commands = []
     try:
-        output = subprocess.check_output(['ausearch', '-m', 'EXECVE'], text=True)
-        for line in output.split('\n'):
-            match = re.search(r'argc=\d+.*?a0=\"([^\"]+)\"', line)
-            if match:
-                command = match.group(1).split("/")[-1]
-                commands.append(command)
+        with subprocess.Popen(['ausearch', '-m', 'EXECVE', '--raw'], stdout=subprocess.PIPE,
+                              bufsize=PIPE_BUFFER_SIZE) as proc:
+            for line in proc.stdout:
+                # Only EXECVE records carry argc=, so both keys must be present
+                start = line.find(_A0_KEY)
+                if start < 0 or _ARGC_KEY not in line:
+                    continue
+                start += len(_A0_KEY)
+                end = line.find(b'"', start)
+                if end > start:
+                    yield line[start:end].rpartition(b"/")[2]
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
     except Exception as e:
         print(f"Failed to parse audit logs: {e}")
-    return commands
 
 #---------------------------- normalize_and_count ---------------------------
 #  Function normalize_and_count
 #
-#  Purpose:  Converts all collected command strings to lowercase and filters 
-#      non-alphabetic entries. Then counts the frequency of each unique command.
+#  Purpose:  Converts the collected raw command counts to lowercase and filters
+#      non-alphabetic entries, merging counts that differ only by case.
+#      Raw commands repeat heavily, so this works once per distinct command
+#      rather than once per occurrence. Commands stay as bytes until here,
+#      so lowercasing is a single ASCII table lookup (bytes.translate).
 #
 #  Parameters:
-#      commands (IN) -- A list of command strings to be normalized and counted.
+#      raw_counts (IN) -- A Counter of raw command bytes.
 #
 #  Returns:  A Counter object (OUT) -- contains command frequencies.
 #----------------------------------------------------------------------------
-def normalize_and_count(commands):
-    normalized = [cmd.lower() for cmd in commands if cmd.isalpha()]
-    return Counter(normalized)
+def normalize_and_count(raw_counts):
+    counter = Counter()
+    for cmd, count in raw_counts.items():
+        if cmd.isalpha():
+            counter[cmd.translate(_LOWERCASE).decode('ascii')] += count
+    return counter
 
 #-------------------------- visualize_command_usage -------------------------
 #  Function visualize_command_usage
 #
 #  Purpose:  Launches a Dash app with search/filter and a "Save & Quit" button
 #      that exports the current chart to PNG, hides the chart, and exits the app.
+#      Only the CHART_TOP_K most frequent matching commands are drawn. Used
+#      when the tool is run with --interactive.
 #
 #  Parameters:
 #      counter (IN) -- A Counter object containing command frequencies.
@@ -162,7 +278,53 @@ def visualize_command_usage(counter):
         print("No data to visualize.")
         return
 
+    # Imported here so batch runs never pay for loading the Dash/Plotly stack
+    import dash
+    from dash import dcc, html, Input, Output, Patch
+    import plotly.express as px
+    import pandas as pd
+    import numpy as np
+
     df = pd.DataFrame(data, columns=['Command', 'Frequency'])
+    # Lowercased once up front so each search is a plain substring scan
+    commands_lower = df['Command'].str.lower().to_numpy(dtype=str)
+
+    # Searches repeat as the user edits the query, so remember recent masks
+    @lru_cache(maxsize=128)
+    def matching_rows(query):
+        return np.char.find(commands_lower, query) >= 0
+
+    # Built once; the search callback only patches its bar data. Counts are
+    # sorted, so the top commands are simply the first rows
+    fig = px.bar(
+        df.head(CHART_TOP_K),
+        x='Command',
+        y='Frequency',
+        title="Command Usage Frequency",
+        labels={'Command': 'Command', 'Frequency': 'Frequency'},
+        height=600,
+        color_discrete_sequence=['#1f77b4']
+    )
+
+    fig.update_layout(
+        title={'text': "<b>Top Command Usage</b>", 
+               'x': 0.5, 
+               'xanchor': 'center',
+               'font': dict(size=23)
+        },
+        xaxis_title="<b>Command</b>",
+        yaxis_title="<b>Frequency</b>",
+        template='plotly_white',
+        xaxis_tickangle=-45, 
+        xaxis=dict(
+            title_font=dict(size=18, family='Arial'),
+            tickfont=dict(size=16)
+        ),
+        yaxis=dict(
+            title_font=dict(size=18, family='Arial'),
+            tickfont=dict(size=16)
+        ),
+        margin=dict(t=40, b=80, l=60, r=30))
 
     app = dash.Dash(__name__)
     server = app.server
@@ -180,52 +342,33 @@ def visualize_command_usage(counter):
                    'display': 'block'
             }
         ),
-        dcc.Graph(id='bar-chart'),
+        dcc.Graph(id='bar-chart', figure=fig),
         html.Button("Save Chart & Quit", id="save-quit-button", n_clicks=0,
                     style={'margin-top': '30px', 'padding': '10px 20px', 'display': 'block', 'margin-left': 'auto', 'margin-right': 'auto'}),
         html.Div(id="save-message", style={'margin-top': '10px', 'color': 'green', 'textAlign': 'center'})
     ], style={'padding': '40px', 'font-family': 'Arial, sans-serif'})
 
-    # Store filtered data
-    filtered_df_store = {"data": df}
+    # Store filtered (charted) data
+    filtered_df_store = {"data": df.head(CHART_TOP_K)}
 
     @app.callback(
         Output('bar-chart', 'figure'),
-        Input('search-input', 'value')
+        Input('search-input', 'value'),
+        prevent_initial_call=True
     )
     def update_chart(search_query):
-        filtered = df[df['Command'].str.contains(search_query, case=False)] if search_query else df
+        if search_query:
+            filtered = df[matching_rows(search_query.lower())]
+        else:
+            filtered = df
+        filtered = filtered.head(CHART_TOP_K)
         filtered_df_store["data"] = filtered  # Save for later use
-        fig = px.bar(
-            filtered,
-            x='Command',
-            y='Frequency',
-            title="Command Usage Frequency",
-            labels={'Command': 'Command', 'Frequency': 'Frequency'},
-            height=600,
-            color_discrete_sequence=['#1f77b4']
-        )
-
-        fig.update_layout(
-            title={'text': "<b>Top Command Usage</b>", 
-                   'x': 0.5, 
-                   'xanchor': 'center',
-                   'font': dict(size=23)
-            },
-            xaxis_title="<b>Command</b>",
-            yaxis_title="<b>Frequency</b>",
-            template='plotly_white',
-            xaxis_tickangle=-45, 
-            xaxis=dict(
-                title_font=dict(size=18, family='Arial'),
-                tickfont=dict(size=16)
-            ),
-            yaxis=dict(
-                title_font=dict(size=18, family='Arial'),
-                tickfont=dict(size=16)
-            ),
-            margin=dict(t=40, b=80, l=60, r=30))
-        return fig
+        # Only the bar data changes with the search, so send just x/y
+        # instead of re-serializing the whole figure
+        patch = Patch()
+        patch['data'][0]['x'] = filtered['Command'].tolist()
+        patch['data'][0]['y'] = filtered['Frequency'].tolist()
+        return patch
 
     @app.callback(
         Output("save-message", "children"),
@@ -274,11 +417,46 @@ def visualize_command_usage(counter):
     Timer(1, lambda: webbrowser.open("http://127.0.0.1:8050")).start()
     app.run(debug=False, use_reloader=False)  # Disable reloader to prevent issues when exiting
 
+#---------------------------- save_command_chart ----------------------------
+#  Function save_command_chart
+#
+#  Purpose:  Draws the CHART_TOP_K most frequent commands as a bar chart and
+#      writes it straight to PNG with matplotlib, without starting the web
+#      dashboard or a headless browser. This is the default, batch mode.
+#
+#  Parameters:
+#      counter (IN) -- A Counter object containing command frequencies.
+#
+#  Returns:  A boolean (OUT) -- True if the chart was written to
+#      "command_usage.png", False if there was no data to plot.
+#----------------------------------------------------------------------------
+def save_command_chart(counter):
+    data = counter.most_common(CHART_TOP_K)
+    if not data:
+        print("No data to visualize.")
+        return False
+
+    import matplotlib
+    matplotlib.use('Agg')  # Render off-screen; no display needed
+    import matplotlib.pyplot as plt
+
+    commands, frequencies = zip(*data)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.bar(commands, frequencies, color='#1f77b4')
+    ax.set_title("Top Command Usage", fontweight='bold')
+    ax.set_xlabel("Command", fontweight='bold')
+    ax.set_ylabel("Frequency", fontweight='bold')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
+    fig.savefig("command_usage.png", dpi=120)
+    plt.close(fig)
+    return True
+
 #------------------------------ export_to_json ------------------------------
 #  Function export_to_json
 #
 #  Purpose:  Writes the command frequency data to a JSON file for later use
-#      or analysis by other tools or analysts.
+#      or analysis by other tools or analysts. Uses orjson when available.
 #
 #  Parameters:
 #      counter (IN) -- A Counter object containing command usage frequencies.
@@ -286,25 +464,41 @@ def visualize_command_usage(counter):
 #  Returns:  None (Writes data to "command_usage.json".)
 #----------------------------------------------------------------------------
 def export_to_json(counter):
-    with open("command_usage.json", "w") as f:
-        json.dump(counter.most_common(), f, indent=4)
+    if orjson is not None:
+        with open("command_usage.json", "wb") as f:
+            f.write(orjson.dumps(counter.most_common(), option=orjson.OPT_INDENT_2))
+    else:
+        with open("command_usage.json", "w") as f:
+            json.dump(counter.most_common(), f, indent=2)
 
 
 def main():
     print("\nCollecting command data...")
-    commands = []
-    commands += read_shell_history()
-    commands += read_process_logs()
-    commands += parse_system_logs()
-    commands += parse_audit_logs()
+    # Each collector is a generator consumed directly by a Counter, so no list
+    # of raw commands is ever built. The collectors are independent and mostly
+    # wait on I/O, so each generator is drained in its own worker thread
+    collectors = (read_shell_history, read_process_logs, parse_system_logs, parse_audit_logs)
+    raw_counts = Counter()
+    with ThreadPoolExecutor(max_workers=len(collectors)) as executor:
+        futures = [executor.submit(Counter, fn()) for fn in collectors]
+        for future in futures:
+            raw_counts.update(future.result())
 
     print("Processing command data...")
-    counter = normalize_and_count(commands)
+    counter = normalize_and_count(raw_counts)
 
     print("Exporting and visualizing results...")
     export_to_json(counter)
-    visualize_command_usage(counter)
-    print("Analysis complete. Results saved to 'command_usage.png' and 'command_usage.json'.")
+    if "--interactive" in sys.argv:
+        # Only returns when there is nothing to show; the dashboard exits itself
+        visualize_command_usage(counter)
+        chart_saved = False
+    else:
+        chart_saved = save_command_chart(counter)
+    if chart_saved:
+        print("Analysis complete. Results saved to 'command_usage.png' and 'command_usage.json'.")
+    else:
+        print("Analysis complete. Results saved to 'command_usage.json'.")
 
 if __name__ == "__main__":
     main()